@@ -6,15 +6,37 @@ from pyadjoint.enlisting import Enlist
 
 
 class GenericSolveBlock(Block):
-    pop_kwargs_keys = ["adj_cb", "adj_bdy_cb", "adj2_cb", "adj2_bdy_cb",
-                       "forward_args", "forward_kwargs", "adj_args", "adj_kwargs"]
+    __slots__ = ['adj_cb', 'adj_bdy_cb', 'adj2_cb', 'adj2_bdy_cb', 'adj_cache', 'adj_sol',
+                 'forward_args', 'forward_kwargs', 'adj_args', 'adj_kwargs', 'assemble_kwargs',
+                 'lhs', 'rhs', 'func', 'function_space', 'bcs', 'linear',
+                 '_dFdu_cache', '_dFdu_cache_key', '_F_form_cache', '_homogenized_bcs', '_dFdu_tensor',
+                 '_bc_dep_ids', '_dFdu_form_cache', '_tmp_u',
+                 '_dFdm_cache']
+    pop_kwargs_keys = frozenset({"adj_cb", "adj_bdy_cb", "adj2_cb", "adj2_bdy_cb", "adj_cache",
+                                 "forward_args", "forward_kwargs", "adj_args", "adj_kwargs"})
 
     def __init__(self, lhs, rhs, func, bcs, *args, **kwargs):
         super().__init__()
+        # Assembled adjoint operator and the checkpoints it was assembled from.
+        self._dFdu_cache = None
+        self._dFdu_cache_key = None
+        self._F_form_cache = None
+        self._dFdu_form_cache = None
+        # With adj_cache, assembled adjoints of dF/dm for Constant dependencies,
+        # for the F_form they were assembled from.
+        self._dFdm_cache = None
+        self._homogenized_bcs = None
+        # With adj_cache, the matrix of the adjoint operator is kept and reassembled in place.
+        self._dFdu_tensor = None
+        # Placeholder for the solution in the action of a linear lhs, replaced by the checkpoint in F_form.
+        self._tmp_u = None
         self.adj_cb = kwargs.pop("adj_cb", None)
         self.adj_bdy_cb = kwargs.pop("adj_bdy_cb", None)
         self.adj2_cb = kwargs.pop("adj2_cb", None)
         self.adj2_bdy_cb = kwargs.pop("adj2_bdy_cb", None)
+        # Keeping the assembled adjoint operator costs a matrix (and possibly a factorization)
+        # per block on the tape, so it is opt-in.
+        self.adj_cache = kwargs.pop("adj_cache", False)
         self.adj_sol = None
 
         self.forward_args = []
@@ -34,6 +56,7 @@ class GenericSolveBlock(Block):
         self.bcs = []
         if bcs is not None:
             self.bcs = Enlist(bcs)
+        self._bc_dep_ids = {id(bc) for bc in self.bcs if isinstance(bc, self.backend.DirichletBC)}
 
         if isinstance(self.lhs, ufl.Form) and isinstance(self.rhs, ufl.Form):
             self.linear = True
@@ -65,11 +88,68 @@ class GenericSolveBlock(Block):
     def __str__(self):
         return "{} = {}".format(str(self.lhs), str(self.rhs))
 
+    def add_dependency(self, dep, no_duplicates=False):
+        super().add_dependency(dep, no_duplicates=no_duplicates)
+        self._clear_caches()
+
+    def reset(self):
+        super().reset()
+        self._clear_caches()
+
+    def _clear_caches(self):
+        self._dFdu_cache = None
+        self._dFdu_cache_key = None
+        self._F_form_cache = None
+        self._dFdu_form_cache = None
+        self._dFdm_cache = None
+
+    def _checkpoints(self):
+        checkpoints = [bv.checkpoint for bv in self.get_dependencies()]
+        checkpoints.append(self.get_outputs()[0].checkpoint)
+        return checkpoints
+
+    @staticmethod
+    def _same_checkpoints(a, b):
+        # Checkpoints are compared by identity. Some blocks update a checkpoint in place
+        # when recomputed, so caches keyed on them are also cleared by reset().
+        return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+    def _get_cached_dFdu(self):
+        """Return the cached adjoint operator if it was assembled from the current checkpoints, else None."""
+        if self._dFdu_cache_key is None:
+            return None
+        if not self._same_checkpoints(self._dFdu_cache_key, self._checkpoints()):
+            return None
+        return self._dFdu_cache
+
+    def _set_cached_dFdu(self, value):
+        if not self.adj_cache:
+            return
+        self._dFdu_cache_key = self._checkpoints()
+        self._dFdu_cache = value
+
+    def _assemble_dFdu(self, dFdu_adj_form, **kwargs):
+        """Assemble the adjoint operator, with adj_cache into the matrix of the previous assembly."""
+        if not self.adj_cache:
+            return self.compat.assemble_adjoint_value(dFdu_adj_form, **kwargs)
+        if self._dFdu_tensor is not None:
+            kwargs["tensor"] = self._dFdu_tensor
+        self._dFdu_tensor = self.compat.assemble_adjoint_value(dFdu_adj_form, **kwargs)
+        return self._dFdu_tensor
+
     def _create_F_form(self):
         # Process the equation forms, replacing values with checkpoints,
         # and gathering lhs and rhs in one single form.
+        # The form is reused by the adjoint, tlm and hessian preparations
+        # as long as the checkpoints are unchanged.
+        checkpoints = self._checkpoints()
+        if self._F_form_cache is not None and self._same_checkpoints(self._F_form_cache[0], checkpoints):
+            return self._F_form_cache[1]
+
         if self.linear:
-            tmp_u = self.compat.create_function(self.function_space)
+            if self._tmp_u is None:
+                self._tmp_u = self.compat.create_function(self.function_space)
+            tmp_u = self._tmp_u
             F_form = self.backend.action(self.lhs, tmp_u) - self.rhs
         else:
             tmp_u = self.func
@@ -77,15 +157,31 @@ class GenericSolveBlock(Block):
 
         replace_map = self._replace_map(F_form)
         replace_map[tmp_u] = self.get_outputs()[0].saved_output
-        return ufl.replace(F_form, replace_map)
+        F_form = ufl.replace(F_form, replace_map)
+        self._F_form_cache = (checkpoints, F_form)
+        return F_form
+
+    def _create_dFdu_forms(self, F_form):
+        """Return dF/du and its adjoint, reusing them while F_form is unchanged."""
+        if self._dFdu_form_cache is None or self._dFdu_form_cache[0] is not F_form:
+            fwd_block_variable = self.get_outputs()[0]
+            u = fwd_block_variable.output
+            dFdu = self.backend.derivative(F_form,
+                                           fwd_block_variable.saved_output,
+                                           self.backend.TrialFunction(u.function_space()))
+            self._dFdu_form_cache = (F_form, dFdu, self.backend.adjoint(dFdu))
+        return self._dFdu_form_cache[1:]
 
     def _homogenize_bcs(self):
-        bcs = []
-        for bc in self.bcs:
-            if isinstance(bc, self.backend.DirichletBC):
-                bc = self.compat.create_bc(bc, homogenize=True)
-            bcs.append(bc)
-        return bcs
+        # Homogenized bcs do not depend on the bc values, so they are only created once.
+        if self._homogenized_bcs is None:
+            bcs = []
+            for bc in self.bcs:
+                if isinstance(bc, self.backend.DirichletBC):
+                    bc = self.compat.create_bc(bc, homogenize=True)
+                bcs.append(bc)
+            self._homogenized_bcs = bcs
+        return self._homogenized_bcs
 
     def _create_initial_guess(self):
         return self.backend.Function(self.function_space)
@@ -101,12 +197,10 @@ class GenericSolveBlock(Block):
         return bcs
 
     def _replace_map(self, form):
-        replace_coeffs = {}
-        for block_variable in self.get_dependencies():
-            coeff = block_variable.output
-            if coeff in form.coefficients():
-                replace_coeffs[coeff] = block_variable.saved_output
-        return replace_coeffs
+        form_coefficients = set(form.coefficients())
+        return {block_variable.output: block_variable.saved_output
+                for block_variable in self.get_dependencies()
+                if block_variable.output in form_coefficients}
 
     def _replace_form(self, form, func=None):
         """Replace the form coefficients with checkpointed values
@@ -121,29 +215,23 @@ class GenericSolveBlock(Block):
 
     def _should_compute_boundary_adjoint(self, relevant_dependencies):
         # Check if DirichletBC derivative is relevant
-        bdy = False
-        for _, dep in relevant_dependencies:
-            if isinstance(dep.output, self.backend.DirichletBC):
-                bdy = True
-                break
-        return bdy
+        if not self._bc_dep_ids:
+            return False
+        return any(id(dep.output) in self._bc_dep_ids for _, dep in relevant_dependencies)
 
     def prepare_evaluate_adj(self, inputs, adj_inputs, relevant_dependencies):
-        fwd_block_variable = self.get_outputs()[0]
-        u = fwd_block_variable.output
-
         dJdu = adj_inputs[0]
 
         F_form = self._create_F_form()
 
-        dFdu = self.backend.derivative(F_form,
-                                       fwd_block_variable.saved_output,
-                                       self.backend.TrialFunction(u.function_space()))
-        dFdu_form = self.backend.adjoint(dFdu)
+        _, dFdu_form = self._create_dFdu_forms(F_form)
         dJdu = dJdu.copy()
 
         compute_bdy = self._should_compute_boundary_adjoint(relevant_dependencies)
-        adj_sol, adj_sol_bdy = self._assemble_and_solve_adj_eq(dFdu_form, dJdu, compute_bdy)
+        # The previous adjoint solution is only used by this block, so its storage
+        # is reused unless a callback may have kept a reference to it.
+        adj_sol = self.adj_sol if self.adj_cb is None else None
+        adj_sol, adj_sol_bdy = self._assemble_and_solve_adj_eq(dFdu_form, dJdu, compute_bdy, adj_sol=adj_sol)
         self.adj_sol = adj_sol
         if self.adj_cb is not None:
             self.adj_cb(adj_sol)
@@ -156,28 +244,51 @@ class GenericSolveBlock(Block):
         r["adj_sol_bdy"] = adj_sol_bdy
         return r
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-        dJdu_copy = dJdu.copy()
-        kwargs = self.assemble_kwargs.copy()
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         # Homogenize and apply boundary conditions on adj_dFdu and dJdu.
         bcs = self._homogenize_bcs()
-        kwargs["bcs"] = bcs
-        dFdu = self.compat.assemble_adjoint_value(dFdu_adj_form, **kwargs)
+        dFdu = self._get_cached_dFdu()
+        if dFdu is None:
+            kwargs = self.assemble_kwargs.copy()
+            kwargs["bcs"] = bcs
+            dFdu = self._assemble_dFdu(dFdu_adj_form, **kwargs)
+            self._set_cached_dFdu(dFdu)
 
         for bc in bcs:
             bc.apply(dJdu)
 
-        adj_sol = self.compat.create_function(self.function_space)
+        adj_sol = self._create_adj_sol(adj_sol)
         self.compat.linalg_solve(dFdu, adj_sol.vector(), dJdu, *self.adj_args, **self.adj_kwargs)
 
         adj_sol_bdy = None
         if compute_bdy:
-            adj_sol_bdy = self.compat.function_from_vector(self.function_space,
-                                                           dJdu_copy - self.compat.assemble_adjoint_value(
-                                                               self.backend.action(dFdu_adj_form, adj_sol)))
+            adj_sol_bdy = self._compute_adj_sol_bdy(dFdu_adj_form, dJdu_copy, adj_sol)
 
         return adj_sol, adj_sol_bdy
 
+    def _create_adj_sol(self, adj_sol=None):
+        """Return a zeroed adj_sol to solve the adjoint equation into, or a new function if it is None.
+
+        The previous adjoint solution must not be picked up by solvers configured with a nonzero initial guess.
+        """
+        if adj_sol is None:
+            return self.compat.create_function(self.function_space)
+        adj_sol.vector()[:] = 0
+        return adj_sol
+
+    def _compute_adj_sol_bdy(self, dFdu_adj_form, dJdu, adj_sol, dFdu=None):
+        """Compute the boundary adjoint solution dJdu - dFdu^* adj_sol.
+
+        dFdu is the assembled adjoint operator without boundary conditions.
+        If it is not available, its action on adj_sol is assembled from dFdu_adj_form instead.
+        """
+        if dFdu is not None:
+            residual = dFdu * adj_sol.vector()
+        else:
+            residual = self.compat.assemble_adjoint_value(self.backend.action(dFdu_adj_form, adj_sol))
+        return self.compat.function_from_vector(self.function_space, dJdu - residual)
+
     def evaluate_adj_component(self, inputs, adj_inputs, block_variable, idx, prepared=None):
         if not self.linear and self.func == block_variable.output:
             # We are not able to calculate derivatives wrt initial guess.
@@ -193,6 +304,9 @@ class GenericSolveBlock(Block):
         elif isinstance(c, self.backend.Constant):
             mesh = self.compat.extract_mesh_from_form(F_form)
             trial_function = self.backend.TrialFunction(c._ad_function_space(mesh))
+            if self.adj_cache and self.backend.__name__ != "firedrake":
+                dFdm = self._assemble_constant_dFdm_adjoint(F_form, c_rep, trial_function, idx)
+                return dFdm * adj_sol.vector()
         elif isinstance(c, self.compat.ExpressionType):
             mesh = F_form.ufl_domain().ufl_cargo()
             c_fs = c._ad_function_space(mesh)
@@ -219,16 +333,26 @@ class GenericSolveBlock(Block):
         else:
             return dFdm
 
-    def prepare_evaluate_tlm(self, inputs, tlm_inputs, relevant_outputs):
-        fwd_block_variable = self.get_outputs()[0]
-        u = fwd_block_variable.output
+    def _assemble_constant_dFdm_adjoint(self, F_form, c_rep, trial_function, idx):
+        """Return the assembled adjoint of -dF/dm for the Constant dependency idx.
+
+        The matrix only has a row per component of the Constant, and is reused
+        for every adjoint solution as long as F_form is unchanged. Only used with adj_cache.
+        """
+        if self._dFdm_cache is None or self._dFdm_cache[0] is not F_form:
+            self._dFdm_cache = (F_form, {})
+        matrices = self._dFdm_cache[1]
+        if idx not in matrices:
+            dFdm = -self.backend.derivative(F_form, c_rep, trial_function)
+            dFdm = self.backend.adjoint(dFdm)
+            matrices[idx] = self.compat.assemble_adjoint_value(dFdm, **self.assemble_kwargs)
+        return matrices[idx]
 
+    def prepare_evaluate_tlm(self, inputs, tlm_inputs, relevant_outputs):
         F_form = self._create_F_form()
 
         # Obtain dFdu.
-        dFdu = self.backend.derivative(F_form,
-                                       fwd_block_variable.saved_output,
-                                       self.backend.TrialFunction(u.function_space()))
+        dFdu, _ = self._create_dFdu_forms(F_form)
 
         return {
             "form": F_form,
@@ -241,7 +365,12 @@ class GenericSolveBlock(Block):
         V = self.get_outputs()[idx].output.function_space()
 
         bcs = []
+        homogeneous_bcs = True
         dFdm = 0.
+        # On DOLFIN, coefficient derivatives are taken in a single derivative call,
+        # so that expanding them traverses the form only once.
+        coefficients = []
+        directions = []
         for block_variable in self.get_dependencies():
             tlm_value = block_variable.tlm_value
             c = block_variable.output
@@ -252,20 +381,35 @@ class GenericSolveBlock(Block):
                     bcs.append(self.compat.create_bc(c, homogenize=True))
                 else:
                     bcs.append(tlm_value)
+                    homogeneous_bcs = False
                 continue
-            elif isinstance(c, self.compat.MeshType):
-                X = self.backend.SpatialCoordinate(c)
-                c_rep = X
 
             if tlm_value is None:
                 continue
 
+            if isinstance(c, self.compat.MeshType):
+                X = self.backend.SpatialCoordinate(c)
+                dFdm += self.backend.derivative(-F_form, X, tlm_value)
+                continue
+
             if c == self.func and not self.linear:
                 continue
 
-            dFdm += self.backend.derivative(-F_form, c_rep, tlm_value)
+            coefficients.append(c_rep)
+            directions.append(tlm_value)
+
+        if len(coefficients) > 1 and self.backend.__name__ != "firedrake":
+            dFdm += ufl.derivative(-F_form, tuple(coefficients), tuple(directions))
+        else:
+            # Firedrake's derivative wrapper only accepts a single coefficient.
+            for c_rep, tlm_value in zip(coefficients, directions):
+                dFdm += self.backend.derivative(-F_form, c_rep, tlm_value)
 
         if isinstance(dFdm, float):
+            if homogeneous_bcs:
+                # Nothing perturbs the equation (e.g. only the initial guess has a tlm value),
+                # so the solution of the tlm equation is zero.
+                return self.backend.Function(V)
             v = dFdu.arguments()[0]
             dFdm = self.backend.inner(self.backend.Constant(numpy.zeros(v.ufl_shape)), v) * self.backend.dx
 
@@ -278,7 +422,7 @@ class GenericSolveBlock(Block):
     def _assemble_and_solve_tlm_eq(self, dFdu, dFdm, dudm, bcs):
         return self._assembled_solve(dFdu, dFdm, dudm, bcs)
 
-    def _assemble_soa_eq_rhs(self, dFdu_form, adj_sol, hessian_input, d2Fdu2):
+    def _assemble_soa_eq_rhs(self, dFdu_adj_form, adj_sol, hessian_input, d2Fdu2):
         # Start piecing together the rhs of the soa equation
         b = hessian_input.copy()
         if len(d2Fdu2.integrals()) > 0:
@@ -286,6 +430,7 @@ class GenericSolveBlock(Block):
         else:
             b_form = d2Fdu2
 
+        dFdu_adj = self.backend.action(dFdu_adj_form, adj_sol)
         for bo in self.get_dependencies():
             c = bo.output
             c_rep = bo.saved_output
@@ -296,13 +441,11 @@ class GenericSolveBlock(Block):
 
             if isinstance(c, self.compat.MeshType):
                 X = self.backend.SpatialCoordinate(c)
-                dFdu_adj = self.backend.action(self.backend.adjoint(dFdu_form), adj_sol)
                 d2Fdudm = ufl.algorithms.expand_derivatives(
                     self.backend.derivative(dFdu_adj, X, tlm_input))
                 if len(d2Fdudm.integrals()) > 0:
                     b_form += d2Fdudm
             elif not isinstance(c, self.backend.DirichletBC):
-                dFdu_adj = self.backend.action(self.backend.adjoint(dFdu_form), adj_sol)
                 b_form += self.backend.derivative(dFdu_adj, c_rep, tlm_input)
 
         b_form = ufl.algorithms.expand_derivatives(b_form)
@@ -311,10 +454,9 @@ class GenericSolveBlock(Block):
 
         return b
 
-    def _assemble_and_solve_soa_eq(self, dFdu_form, adj_sol, hessian_input, d2Fdu2, compute_bdy):
-        b = self._assemble_soa_eq_rhs(dFdu_form, adj_sol, hessian_input, d2Fdu2)
-        dFdu_form = self.backend.adjoint(dFdu_form)
-        adj_sol2, adj_sol2_bdy = self._assemble_and_solve_adj_eq(dFdu_form, b, compute_bdy)
+    def _assemble_and_solve_soa_eq(self, dFdu_adj_form, adj_sol, hessian_input, d2Fdu2, compute_bdy):
+        b = self._assemble_soa_eq_rhs(dFdu_adj_form, adj_sol, hessian_input, d2Fdu2)
+        adj_sol2, adj_sol2_bdy = self._assemble_and_solve_adj_eq(dFdu_adj_form, b, compute_bdy)
         if self.adj2_cb is not None:
             self.adj2_cb(adj_sol2)
         if self.adj2_bdy_cb is not None and compute_bdy:
@@ -336,7 +478,7 @@ class GenericSolveBlock(Block):
         F_form = self._create_F_form()
 
         # Using the equation Form we derive dF/du, d^2F/du^2 * du/dm * direction.
-        dFdu_form = self.backend.derivative(F_form, fwd_block_variable.saved_output)
+        dFdu_form, dFdu_adj_form = self._create_dFdu_forms(F_form)
         d2Fdu2 = ufl.algorithms.expand_derivatives(
             self.backend.derivative(dFdu_form, fwd_block_variable.saved_output, tlm_output))
 
@@ -344,7 +486,7 @@ class GenericSolveBlock(Block):
         if adj_sol is None:
             raise RuntimeError("Hessian computation was run before adjoint.")
         bdy = self._should_compute_boundary_adjoint(relevant_dependencies)
-        adj_sol2, adj_sol2_bdy = self._assemble_and_solve_soa_eq(dFdu_form, adj_sol, hessian_input, d2Fdu2, bdy)
+        adj_sol2, adj_sol2_bdy = self._assemble_and_solve_soa_eq(dFdu_adj_form, adj_sol, hessian_input, d2Fdu2, bdy)
 
         r = {}
         r["adj_sol2"] = adj_sol2
@@ -419,11 +561,12 @@ class GenericSolveBlock(Block):
                 continue
 
             # TODO: If tlm_input is a Sum, this crashes in some instances?
+            # The derivatives are expanded by the expand_derivatives call on the hessian form below.
             if isinstance(c2_rep, self.compat.MeshType):
                 X = self.backend.SpatialCoordinate(c2_rep)
-                d2Fdm2 += ufl.algorithms.expand_derivatives(self.backend.derivative(dFdm_adj, X, tlm_input))
+                d2Fdm2 += self.backend.derivative(dFdm_adj, X, tlm_input)
             else:
-                d2Fdm2 += ufl.algorithms.expand_derivatives(self.backend.derivative(dFdm_adj, c2_rep, tlm_input))
+                d2Fdm2 += self.backend.derivative(dFdm_adj, c2_rep, tlm_input)
 
         hessian_form = ufl.algorithms.expand_derivatives(d2Fdm2 + dFdm_adj2 + d2Fdudm)
         hessian_output = 0
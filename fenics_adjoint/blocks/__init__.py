@@ -1,7 +1,7 @@
 # flake8: noqa
 
 from .common import *
-from .solving import SolveLinearSystemBlock, SolveVarFormBlock
+from .solving import SolveLinearSystemBlock, SolveLinearSystemBlockHelper, SolveVarFormBlock
 from .projection import ProjectBlock
 from .variational_solver import LinearVariationalSolveBlock, NonlinearVariationalSolveBlock
 from .krylov_solver import KrylovSolveBlock, KrylovSolveBlockHelper
@@ -11,7 +11,7 @@ class AssembleBlock(blocks.AssembleBlock, Backend):
 
 
 class GenericSolveBlock(blocks.GenericSolveBlock, Backend):
-    pass
+    __slots__ = []
 
 
 class FunctionAssignBlock(blocks.FunctionAssignBlock, Backend):
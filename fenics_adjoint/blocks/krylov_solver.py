@@ -16,6 +16,9 @@ class KrylovSolveBlockHelper(object):
 
 
 class KrylovSolveBlock(SolveLinearSystemBlock):
+    __slots__ = ['krylov_solver_parameters', 'nonzero_initial_guess', 'initial_guess',
+                 'pc_operator', 'method', 'preconditioner']
+
     def __init__(self, A, u, b,
                  krylov_solver_parameters,
                  block_helper, nonzero_initial_guess,
@@ -50,8 +53,8 @@ class KrylovSolveBlock(SolveLinearSystemBlock):
             backend.Function.assign(r, self.initial_guess.saved_output)
         return r
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-        dJdu_copy = dJdu.copy()
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         bcs = self._homogenize_bcs()
 
         solver = self.block_helper.adjoint_solver
@@ -86,7 +89,7 @@ class KrylovSolveBlock(SolveLinearSystemBlock):
         solver.parameters.update(self.krylov_solver_parameters)
         [bc.apply(dJdu) for bc in bcs]
 
-        adj_sol = backend.Function(self.function_space)
+        adj_sol = self._create_adj_sol(adj_sol)
         solver.solve(adj_sol.vector(), dJdu)
 
         adj_sol_bdy = None
@@ -15,14 +15,16 @@ class LUSolveBlockHelper(object):
 
 
 class LUSolveBlock(SolveLinearSystemBlock):
+    __slots__ = ['lu_solver_parameters', 'method']
+
     def __init__(self, A, u, b, *args, **kwargs):
         super(LUSolveBlock, self).__init__(A, u, b, **kwargs)
         self.lu_solver_parameters = kwargs.pop("lu_solver_parameters")
         self.block_helper = kwargs.pop("block_helper")
         self.method = kwargs.pop("lu_solver_method")
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-        dJdu_copy = dJdu.copy()
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         bcs = self._homogenize_bcs()
 
         solver = self.block_helper.adjoint_solver
@@ -42,7 +44,7 @@ class LUSolveBlock(SolveLinearSystemBlock):
         solver.parameters.update(self.lu_solver_parameters)
         [bc.apply(dJdu) for bc in bcs]
 
-        adj_sol = backend.Function(self.function_space)
+        adj_sol = self._create_adj_sol(adj_sol)
         solver.solve(adj_sol.vector(), dJdu)
 
         adj_sol_bdy = None
@@ -17,6 +17,9 @@ class PETScKrylovSolveBlockHelper(object):
 
 
 class PETScKrylovSolveBlock(SolveLinearSystemBlock):
+    __slots__ = ['krylov_solver_parameters', 'nonzero_initial_guess', 'initial_guess',
+                 'pc_operator', 'method', 'preconditioner', 'ksp_options_prefix', '_ad_nullspace']
+
     def __init__(self, A, u, b, *args, **kwargs):
         super(PETScKrylovSolveBlock, self).__init__(A, u, b, **kwargs)
         self.krylov_solver_parameters = kwargs.pop("krylov_solver_parameters")
@@ -47,8 +50,8 @@ class PETScKrylovSolveBlock(SolveLinearSystemBlock):
             backend.Function.assign(r, self.initial_guess.saved_output)
         return r
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-        dJdu_copy = dJdu.copy()
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         bcs = self._homogenize_bcs()
 
         solver = self.block_helper.adjoint_solver
@@ -95,7 +98,7 @@ class PETScKrylovSolveBlock(SolveLinearSystemBlock):
             if self._ad_nullspace._ad_orthogonalized:
                 self._ad_nullspace.orthogonalize(dJdu)
 
-        adj_sol = backend.Function(self.function_space)
+        adj_sol = self._create_adj_sol(adj_sol)
         solver.solve(adj_sol.vector(), dJdu)
 
         adj_sol_bdy = None
@@ -2,6 +2,8 @@ from . import SolveVarFormBlock
 
 
 class ProjectBlock(SolveVarFormBlock):
+    __slots__ = []
+
     def __init__(self, v, V, output, bcs=[], *args, **kwargs):
         mesh = kwargs.pop("mesh", None)
         if mesh is None:
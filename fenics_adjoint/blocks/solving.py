@@ -1,8 +1,29 @@
+from functools import lru_cache
+
 from . import GenericSolveBlock
 
 
+@lru_cache(maxsize=1)
+def _lu_solver_methods(backend):
+    return frozenset(backend.lu_solver_methods())
+
+
+class SolveLinearSystemBlockHelper(object):
+    def __init__(self):
+        self.forward_solver = None
+        self.forward_key = None
+
+    def reset(self):
+        self.forward_solver = None
+        self.forward_key = None
+
+
 class SolveLinearSystemBlock(GenericSolveBlock):
+    __slots__ = ['ident_zeros_tol', 'assemble_system', 'forward_helper']
+    pop_kwargs_keys = GenericSolveBlock.pop_kwargs_keys | {"forward_cache"}
+
     def __init__(self, A, u, b, *args, **kwargs):
+        forward_cache = kwargs.pop("forward_cache", False)
         lhs = A.form
         func = u.function
         rhs = b.form
@@ -14,6 +35,14 @@ class SolveLinearSystemBlock(GenericSolveBlock):
         self.ident_zeros_tol = A.ident_zeros_tol if hasattr(A, "ident_zeros_tol") else None
         self.assemble_system = A.assemble_system if hasattr(A, "assemble_system") else False
 
+        # With forward_cache, blocks solving with the same assembled matrix share the forward factorization.
+        # Subclasses with their own _forward_solve never use it.
+        self.forward_helper = None
+        if forward_cache and type(self)._forward_solve is SolveLinearSystemBlock._forward_solve:
+            if not hasattr(A, "_ad_solve_block_helper"):
+                A._ad_solve_block_helper = SolveLinearSystemBlockHelper()
+            self.forward_helper = A._ad_solve_block_helper
+
     def _init_solver_parameters(self, args, kwargs):
         super()._init_solver_parameters(args, kwargs)
         if len(self.forward_args) <= 0:
@@ -22,50 +51,129 @@ class SolveLinearSystemBlock(GenericSolveBlock):
         if len(self.adj_args) <= 0:
             self.adj_args = self.forward_args
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-        dJdu_copy = dJdu.copy()
+    def reset(self):
+        super().reset()
+        # Some blocks update their checkpoints in place when recomputed, so a
+        # factorization is only shared by the solves of a single recomputation.
+        if self.forward_helper is not None:
+            self.forward_helper.reset()
+
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         bcs = self._homogenize_bcs()
-        if self.assemble_system:
-            rhs_bcs_form = self.backend.inner(self.backend.Function(self.function_space),
-                                              dFdu_adj_form.arguments()[0]) * self.backend.dx
-            A, _ = self.backend.assemble_system(dFdu_adj_form, rhs_bcs_form, bcs, **self.assemble_kwargs)
-        else:
-            kwargs = self.assemble_kwargs.copy()
-            kwargs["bcs"] = bcs
-            A = self.compat.assemble_adjoint_value(dFdu_adj_form, **kwargs)
-        if self.ident_zeros_tol is not None:
-            A.ident_zeros(self.ident_zeros_tol)
+        cached = self._get_cached_dFdu()
+        if cached is None:
+            # A copy of the operator without bcs lets the boundary adjoint be computed with a matvec.
+            A_no_bcs = None
+            if self.assemble_system:
+                rhs_bcs_form = self.backend.inner(self.backend.Function(self.function_space),
+                                                  dFdu_adj_form.arguments()[0]) * self.backend.dx
+                A, _ = self.backend.assemble_system(dFdu_adj_form, rhs_bcs_form, bcs, **self.assemble_kwargs)
+            elif self.backend.__name__ == "firedrake":
+                kwargs = self.assemble_kwargs.copy()
+                kwargs["bcs"] = bcs
+                A = self._assemble_dFdu(dFdu_adj_form, **kwargs)
+            else:
+                A = self._assemble_dFdu(dFdu_adj_form, **self.assemble_kwargs)
+                if compute_bdy:
+                    A_no_bcs = A.copy()
+                [bc.apply(A) for bc in bcs]
+            if self.ident_zeros_tol is not None:
+                A.ident_zeros(self.ident_zeros_tol)
+            cached = (A, A_no_bcs)
+            self._set_cached_dFdu(cached)
+        A, A_no_bcs = cached
         [bc.apply(dJdu) for bc in bcs]
 
-        adj_sol = self.compat.create_function(self.function_space)
+        adj_sol = self._create_adj_sol(adj_sol)
         self.compat.linalg_solve(A, adj_sol.vector(), dJdu, *self.adj_args, **self.adj_kwargs)
 
         adj_sol_bdy = None
         if compute_bdy:
-            adj_sol_bdy = self.compat.function_from_vector(self.function_space,
-                                                           dJdu_copy - self.compat.assemble_adjoint_value(
-                                                               self.backend.action(dFdu_adj_form, adj_sol)))
+            adj_sol_bdy = self._compute_adj_sol_bdy(dFdu_adj_form, dJdu_copy, adj_sol, A_no_bcs)
 
         return adj_sol, adj_sol_bdy
 
-    def _forward_solve(self, lhs, rhs, func, bcs, **kwargs):
+    def invalidate_jacobian(self):
+        """Forget the cached factorization of the forward operator.
+
+        The factorization is otherwise reused by the solves with the same matrix
+        within a recomputation, as long as the checkpoints it depends on are unchanged.
+        """
+        if self.forward_helper is not None:
+            self.forward_helper.reset()
+
+    def _forward_lu_method(self):
+        if self.backend.__name__ == "firedrake":
+            return None
+        solver_method = self.forward_args[0] if len(self.forward_args) >= 1 else "default"
+        solver_method = "default" if solver_method == "lu" else solver_method
+        if solver_method not in _lu_solver_methods(self.backend):
+            return None
+        return solver_method
+
+    def _forward_lhs_key(self, solver_method):
+        rhs_only = set(self.rhs.coefficients()) - set(self.lhs.coefficients())
+        checkpoints = [bv.checkpoint for bv in self.get_dependencies() if bv.output not in rhs_only]
+        return self.lhs, solver_method, checkpoints
+
+    def _same_forward_lhs_key(self, key):
+        cached_key = self.forward_helper.forward_key
+        if cached_key is None:
+            return False
+        lhs, solver_method, checkpoints = key
+        cached_lhs, cached_solver_method, cached_checkpoints = cached_key
+        return (solver_method == cached_solver_method and lhs.equals(cached_lhs)
+                and self._same_checkpoints(checkpoints, cached_checkpoints))
+
+    def _assemble_forward_rhs(self, lhs, rhs, bcs):
+        if self.assemble_system:
+            system_assembler = self.backend.SystemAssembler(lhs, rhs, bcs)
+            b = self.backend.Function(self.function_space).vector()
+            system_assembler.assemble(b)
+        else:
+            b = self.backend.assemble(rhs)
+            [bc.apply(b) for bc in bcs]
+        return b
+
+    def _assemble_forward_system(self, lhs, rhs, bcs):
         if self.assemble_system:
             A, b = self.backend.assemble_system(lhs, rhs, bcs)
         else:
             assemble_kwargs = self.assemble_kwargs.copy()
             assemble_kwargs["bcs"] = bcs
             A = self.compat.assemble_adjoint_value(lhs, **assemble_kwargs)
-            b = self.backend.assemble(rhs)
-            [bc.apply(b) for bc in bcs]
+            b = self._assemble_forward_rhs(lhs, rhs, bcs)
 
         if self.ident_zeros_tol is not None:
             A.ident_zeros(self.ident_zeros_tol)
+        return A, b
+
+    def _forward_lu_solve(self, lhs, rhs, func, bcs, solver_method):
+        key = self._forward_lhs_key(solver_method)
+        helper = self.forward_helper
+        if self._same_forward_lhs_key(key):
+            b = self._assemble_forward_rhs(lhs, rhs, bcs)
+        else:
+            A, b = self._assemble_forward_system(lhs, rhs, bcs)
+            helper.forward_solver = self.backend.LUSolver(A, solver_method)
+            helper.forward_key = key
+
+        helper.forward_solver.solve(func.vector(), b)
+        return func
+
+    def _forward_solve(self, lhs, rhs, func, bcs, **kwargs):
+        solver_method = self._forward_lu_method() if self.forward_helper is not None else None
+        if solver_method is not None:
+            return self._forward_lu_solve(lhs, rhs, func, bcs, solver_method)
 
+        A, b = self._assemble_forward_system(lhs, rhs, bcs)
         self.backend.solve(A, func.vector(), b, *self.forward_args, **self.forward_kwargs)
         return func
 
 
 class SolveVarFormBlock(GenericSolveBlock):
+    __slots__ = []
     pop_kwargs_keys = GenericSolveBlock.pop_kwargs_keys
 
     def __init__(self, equation, func, bcs=[], *args, **kwargs):
@@ -99,35 +207,43 @@ class SolveVarFormBlock(GenericSolveBlock):
                     self.adj_args = tuple(adj_args)
             self.adj_kwargs = solver_parameters
 
-    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy=True):
-        dJdu_copy = dJdu.copy()
+    def _assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy=True, adj_sol=None):
+        dJdu_copy = dJdu.copy() if compute_bdy else None
         bcs = self._homogenize_bcs()
-        kwargs = self.assemble_kwargs.copy()
-        kwargs["bcs"] = bcs
-        dFdu = self.compat.assemble_adjoint_value(dFdu_adj_form, **kwargs)
 
-        # Apply boundary conditions on adj_dFdu and dJdu.
+        # The solver is cached together with the operator so that the
+        # factorization is reused by successive adjoint solves.
+        cached = self._get_cached_dFdu()
+        if cached is None:
+            dFdu = self._assemble_dFdu(dFdu_adj_form, **self.assemble_kwargs)
+            # A copy of the operator without bcs lets the boundary adjoint be computed with a matvec.
+            dFdu_no_bcs = dFdu.copy() if compute_bdy else None
+            for bc in bcs:
+                bc.apply(dFdu)
+
+            solver_method = self.adj_args[0] if len(self.adj_args) >= 1 else "default"
+            solver_method = "default" if solver_method == "lu" else solver_method
+
+            if solver_method in _lu_solver_methods(self.backend):
+                solver = self.backend.LUSolver(dFdu, solver_method)
+                solver_parameters = self.adj_kwargs.get("lu_solver", {})
+            else:
+                solver = self.backend.KrylovSolver(dFdu, *self.adj_args)
+                solver_parameters = self.adj_kwargs.get("krylov_solver", {})
+            solver.parameters.update(solver_parameters)
+            cached = (solver, dFdu_no_bcs)
+            self._set_cached_dFdu(cached)
+        solver, dFdu_no_bcs = cached
+
+        # Apply boundary conditions on dJdu.
         for bc in bcs:
             bc.apply(dJdu)
 
-        adj_sol = self.compat.create_function(self.function_space)
-        lu_solver_methods = self.backend.lu_solver_methods()
-        solver_method = self.adj_args[0] if len(self.adj_args) >= 1 else "default"
-        solver_method = "default" if solver_method == "lu" else solver_method
-
-        if solver_method in lu_solver_methods:
-            solver = self.backend.LUSolver(solver_method)
-            solver_parameters = self.adj_kwargs.get("lu_solver", {})
-        else:
-            solver = self.backend.KrylovSolver(*self.adj_args)
-            solver_parameters = self.adj_kwargs.get("krylov_solver", {})
-        solver.parameters.update(solver_parameters)
-        solver.solve(dFdu, adj_sol.vector(), dJdu)
+        adj_sol = self._create_adj_sol(adj_sol)
+        solver.solve(adj_sol.vector(), dJdu)
 
         adj_sol_bdy = None
         if compute_bdy:
-            adj_sol_bdy = self.compat.function_from_vector(self.function_space,
-                                                           dJdu_copy - self.compat.assemble_adjoint_value(
-                                                               self.backend.action(dFdu_adj_form, adj_sol)))
+            adj_sol_bdy = self._compute_adj_sol_bdy(dFdu_adj_form, dJdu_copy, adj_sol, dFdu_no_bcs)
 
         return adj_sol, adj_sol_bdy
@@ -3,6 +3,9 @@ from . import SolveVarFormBlock
 
 
 class LinearVariationalSolveBlock(SolveVarFormBlock):
+    __slots__ = ['problem_args', 'problem_kwargs', 'solver_params',
+                 'solver_args', 'solver_kwargs', 'solve_args', 'solve_kwargs']
+
     def __init__(self, equation, func, bcs,
                  problem_args, problem_kwargs,
                  solver_params, solver_args,
@@ -37,6 +40,9 @@ class LinearVariationalSolveBlock(SolveVarFormBlock):
 
 
 class NonlinearVariationalSolveBlock(SolveVarFormBlock):
+    __slots__ = ['problem_J', 'problem_args', 'problem_kwargs', 'solver_params',
+                 'solver_args', 'solver_kwargs', 'solve_args', 'solve_kwargs']
+
     def __init__(self, equation, func, bcs, problem_J,
                  problem_args, problem_kwargs,
                  solver_params, solver_args,
@@ -3,5 +3,6 @@ import fenics
 
 
 class Backend:
+    __slots__ = []
     backend = fenics
     compat = compat(fenics)
@@ -31,9 +31,20 @@ def solve(*args, **kwargs):
             The boundary values are zero.
         adj2_bdy_cb (function, optional): callback function supplying the second-order adjoint solution on
             the boundary. The interior values are not guaranteed to be zero.
+        adj_cache (bool, optional): keep the assembled adjoint operator (and its factorization, if any)
+            between adjoint evaluations, so that repeated derivatives at the same point do not reassemble it.
+            This holds one matrix per solve on the tape. Default False.
+        forward_cache (bool, optional): only for solves with an assembled matrix and an LU method. When the tape
+            is recomputed, share one factorization between the solves with the same matrix, as long as its
+            dependencies are unchanged. The factorization is kept until the next recomputation. Default False.
 
     """
     annotate = annotate_tape(kwargs)
+    if not annotate and not annotate_tape():
+        # Annotation is already paused (e.g. inside stop_annotating()), so there is
+        # nothing to record and nothing to pause.
+        return backend.solve(*args, **kwargs)
+
     if annotate:
         tape = get_working_tape()
 
@@ -47,8 +47,9 @@ def __SolveVarFormBlock__init_params(self, args, kwargs):
     _init_params(self, args, kwargs, varform=True)
 
 
-def __SolveVarFormBlock__assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy):
-    return super(SolveVarFormBlock, self)._assemble_and_solve_adj_eq(dFdu_adj_form, dJdu, compute_bdy)
+def __SolveVarFormBlock__assemble_and_solve_adj_eq(self, dFdu_adj_form, dJdu, compute_bdy, adj_sol=None):
+    return super(SolveVarFormBlock, self)._assemble_and_solve_adj_eq(dFdu_adj_form, dJdu, compute_bdy,
+                                                                     adj_sol=adj_sol)
 
 
 SolveVarFormBlock._init_solver_parameters = __SolveVarFormBlock__init_params
@@ -1,5 +1,7 @@
 import logging
 
+import numpy
+
 from .enlisting import Enlist
 from .tape import stop_annotating
 
@@ -46,12 +48,10 @@ def taylor_test(J, m, h, dJdm=None, Hm=0):
             return ms.delist(ret)
 
         print("Running Taylor test")
-        residuals = []
         epsilons = [0.01 / 2 ** i for i in range(4)]
-        for eps in epsilons:
-            Jp = J(perturbe(eps))
-            res = abs(Jp - Jm - eps * dJdm - 0.5 * eps ** 2 * Hm)
-            residuals.append(res)
+        Jps = numpy.array([J(perturbe(eps)) for eps in epsilons])
+        eps = numpy.array(epsilons)
+        residuals = numpy.abs(Jps - Jm - eps * dJdm - 0.5 * eps ** 2 * Hm).tolist()
 
         if min(residuals) < 1E-15:
             logging.warning("The taylor remainder is close to machine precision.")
@@ -60,11 +60,13 @@ def taylor_test(J, m, h, dJdm=None, Hm=0):
 
 
 def convergence_rates(E_values, eps_values, show=True):
-    from numpy import log
-    r = []
-    for i in range(1, len(eps_values)):
-        r.append(log(E_values[i] / E_values[i - 1])
-                 / log(eps_values[i] / eps_values[i - 1]))
+    E_values = numpy.asarray(E_values)
+    eps_values = numpy.asarray(eps_values)
+    if (E_values == 0).any():
+        # The rates are undefined, and must not let a degenerate taylor test pass.
+        raise ZeroDivisionError("Cannot compute convergence rates from a zero residual.")
+    r = (numpy.log(E_values[1:] / E_values[:-1])
+         / numpy.log(eps_values[1:] / eps_values[:-1])).tolist()
     if show:
         print("Computed convergence rates: {}".format(r))
     return r
@@ -138,11 +140,11 @@ def taylor_to_dict(J, m, h):
 
         epsilons = [0.01 / 2**i for i in range(4)]
         error_dict["eps"] = epsilons
-        for eps in epsilons:
-            Jp = J(perturbe(eps))
-            error_dict["R0"]["Residual"].append(abs(Jp - Jm))
-            error_dict["R1"]["Residual"].append(abs(Jp - Jm - eps * dJdm))
-            error_dict["R2"]["Residual"].append(abs(Jp - Jm - eps * dJdm - 0.5 * eps**2 * Hmh))
+        Jps = numpy.array([J(perturbe(eps)) for eps in epsilons])
+        eps = numpy.array(epsilons)
+        error_dict["R0"]["Residual"] = numpy.abs(Jps - Jm).tolist()
+        error_dict["R1"]["Residual"] = numpy.abs(Jps - Jm - eps * dJdm).tolist()
+        error_dict["R2"]["Residual"] = numpy.abs(Jps - Jm - eps * dJdm - 0.5 * eps**2 * Hmh).tolist()
 
         for key in error_dict.keys():
             if key != "eps":
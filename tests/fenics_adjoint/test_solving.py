@@ -561,3 +561,175 @@ def test_solver_ident_zeros():
     assert(min(results["R0"]["Rate"]) > 0.95)
     assert(min(results["R1"]["Rate"]) > 1.95)
     assert(min(results["R2"]["Rate"]) > 2.95)
+
+
+def test_repeated_derivative():
+    mesh = IntervalMesh(10, 0, 1)
+    V = FunctionSpace(mesh, "Lagrange", 1)
+
+    f = Function(V)
+    f.vector()[:] = 1
+
+    u = Function(V)
+    v = TestFunction(V)
+    bc = DirichletBC(V, Constant(1), "on_boundary")
+
+    F = f * inner(grad(u), grad(v)) * dx + u**2 * v * dx - f * v * dx
+    solve(F == 0, u, bc, adj_cache=True)
+    J = assemble(u**2 * dx)
+    Jhat = ReducedFunctional(J, Control(f))
+
+    dJdf = Jhat.derivative().vector().get_local()
+    assert (dJdf == Jhat.derivative().vector().get_local()).all()
+
+    # The adjoint operator depends on the control, so it must be reassembled at a new point.
+    f2 = Function(V)
+    f2.vector()[:] = 2
+    Jhat(f2)
+    assert (dJdf != Jhat.derivative().vector().get_local()).any()
+
+    h = Function(V)
+    h.vector()[:] = 1
+    assert taylor_test(Jhat, f2, h) > 1.9
+
+
+def test_linear_system_reused_factorization(monkeypatch):
+    import fenics
+
+    factorizations = []
+
+    class CountingLUSolver(fenics.LUSolver):
+        def __init__(self, *args, **kwargs):
+            factorizations.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(fenics, "LUSolver", CountingLUSolver)
+
+    mesh = UnitSquareMesh(8, 8)
+    V = FunctionSpace(mesh, "CG", 1)
+    u, v = TrialFunction(V), TestFunction(V)
+
+    k = Constant(1)
+    f = Function(V)
+    f.vector()[:] = 1
+    bc = DirichletBC(V, Constant(0), "on_boundary")
+
+    # The matrix depends on k only, so its factorization is shared by every
+    # time step of a recomputation.
+    A = assemble(k * inner(grad(u), grad(v)) * dx + u * v * dx)
+    bc.apply(A)
+    u_prev = Function(V)
+    u_ = Function(V)
+    for i in range(3):
+        b = assemble((u_prev + f) * v * dx)
+        bc.apply(b)
+        solve(A, u_.vector(), b, "lu", forward_cache=True)
+        u_prev.assign(u_)
+
+    J = assemble(u_prev**2 * dx)
+    assert len(factorizations) == 0
+
+    Jhat = ReducedFunctional(J, Control(f))
+    Jhat(f)
+    assert len(factorizations) == 1
+    assert A._ad_solve_block_helper.forward_solver is not None
+
+    # Every recomputation starts from a fresh factorization.
+    Jhat(f)
+    assert len(factorizations) == 2
+
+    h = Function(V)
+    h.vector()[:] = 0.1
+    Jhat = ReducedFunctional(J, Control(f))
+    assert taylor_test(Jhat, f, h) > 1.9
+
+    Jhat = ReducedFunctional(J, Control(k))
+    assert taylor_test(Jhat, k, Constant(0.1)) > 1.9
+
+    # Without forward_cache nothing is shared or kept.
+    A2 = assemble(inner(grad(u), grad(v)) * dx + u * v * dx)
+    bc.apply(A2)
+    solve(A2, u_.vector(), b, "lu")
+    assert not hasattr(A2, "_ad_solve_block_helper")
+
+
+def test_linear_system_expression_coefficient():
+    mesh = UnitSquareMesh(8, 8)
+    V = FunctionSpace(mesh, "CG", 1)
+    u, v = TrialFunction(V), TestFunction(V)
+
+    # The Expression checkpoint is updated in place on replay,
+    # so the forward factorization must not survive it.
+    c = Constant(1.0)
+    k = Expression("c*x[0] + 1", c=c, degree=1)
+    k.user_defined_derivatives = {c: Expression("x[0]", degree=1)}
+    A = assemble(k * u * v * dx)
+    b = assemble(v * dx)
+    sol = Function(V)
+    solve(A, sol.vector(), b, "lu", forward_cache=True)
+    J = assemble(sol**2 * dx)
+    Jhat = ReducedFunctional(J, Control(c))
+
+    c_new = Constant(3.0)
+    J_new = Jhat(c_new)
+    with stop_annotating():
+        k_new = Expression("c*x[0] + 1", c=3.0, degree=1)
+        sol_new = Function(V)
+        solve(assemble(k_new * u * v * dx), sol_new.vector(), b)
+        J_exact = assemble(sol_new**2 * dx)
+    assert abs(J_new - J_exact) < 1e-12 * abs(J_exact)
+
+    assert taylor_test(Jhat, c_new, Constant(0.1)) > 1.9
+
+
+def test_repeated_derivative_constant_controls():
+    mesh = UnitSquareMesh(8, 8)
+    V = FunctionSpace(mesh, "CG", 1)
+    u, v = TrialFunction(V), TestFunction(V)
+
+    c1 = Constant(2.0)
+    c2 = Constant((1.0, 0.5))
+    bc = DirichletBC(V, Constant(0), "on_boundary")
+
+    sol = Function(V)
+    solve(c1 * inner(grad(u), grad(v)) * dx + u * v * dx == inner(c2, grad(v)) * dx + c1 * v * dx, sol, bc,
+          adj_cache=True)
+    J = assemble(sol**2 * dx)
+
+    controls = [Control(c1), Control(c2)]
+    Jhat = ReducedFunctional(J, controls)
+    dJ1, dJ2 = Jhat.derivative()
+    dJ1_again, dJ2_again = Jhat.derivative()
+    assert float(dJ1) == float(dJ1_again)
+    assert (dJ2.values() == dJ2_again.values()).all()
+
+    Jhat([Constant(3.0), Constant((0.5, 1.0))])
+    assert taylor_test(Jhat, [Constant(3.0), Constant((0.5, 1.0))], [Constant(0.1), Constant((0.1, 0.2))]) > 1.9
+
+
+def test_adjoint_operator_not_kept_by_default():
+    from fenics_adjoint.blocks import SolveVarFormBlock
+
+    tape = Tape()
+    set_working_tape(tape)
+
+    mesh = IntervalMesh(10, 0, 1)
+    V = FunctionSpace(mesh, "Lagrange", 1)
+    u, v = TrialFunction(V), TestFunction(V)
+
+    f = Function(V)
+    f.vector()[:] = 1
+    bc = DirichletBC(V, Constant(1), "on_boundary")
+
+    sol = Function(V)
+    for i in range(3):
+        solve(inner(grad(u), grad(v)) * dx + u * v * dx == f * v * dx, sol, bc)
+    J = assemble(sol**2 * dx)
+    Jhat = ReducedFunctional(J, Control(f))
+    Jhat.derivative()
+
+    solve_blocks = [block for block in tape.get_blocks() if isinstance(block, SolveVarFormBlock)]
+    assert len(solve_blocks) == 3
+    for block in solve_blocks:
+        assert block._get_cached_dFdu() is None
+        assert block._dFdu_tensor is None
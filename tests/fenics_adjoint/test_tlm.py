@@ -95,6 +95,72 @@ def test_tlm_func():
 
     assert (taylor_test(Jhat, g, h, dJdm=J.block_variable.tlm_value) > 1.9)
 
+
+def test_tlm_two_controls():
+    tape = Tape()
+    set_working_tape(tape)
+    mesh = UnitSquareMesh(8, 8)
+    V = FunctionSpace(mesh, "Lagrange", 1)
+
+    c = Constant(2.0)
+    f = Function(V)
+    f.vector()[:] = 1
+
+    u = Function(V)
+    v = TestFunction(V)
+    bc = DirichletBC(V, 0, "on_boundary")
+
+    F = c * inner(grad(u), grad(v)) * dx + u ** 3 * v * dx - f * v * dx
+    solve(F == 0, u, bc)
+
+    J = assemble(u ** 2 * dx)
+    Jhat = ReducedFunctional(J, [Control(f), Control(c)])
+
+    h = Function(V)
+    h.vector()[:] = rand(V.dim())
+    k = Constant(0.5)
+    g = f.copy(deepcopy=True)
+    f.tlm_value = h
+    c.tlm_value = k
+    tape.evaluate_tlm()
+
+    assert (taylor_test(Jhat, [g, Constant(c)], [h, k], dJdm=J.block_variable.tlm_value) > 1.9)
+
+
+def test_tlm_initial_guess_only():
+    tape = Tape()
+    set_working_tape(tape)
+    mesh = IntervalMesh(10, 0, 1)
+    V = FunctionSpace(mesh, "Lagrange", 1)
+
+    f = Function(V)
+    f.vector()[:] = 1
+
+    u = Function(V)
+    v = TestFunction(V)
+    bc = DirichletBC(V, 1, "on_boundary")
+
+    F = inner(grad(u), grad(v)) * dx + u ** 3 * v * dx - f * v * dx
+    solve(F == 0, u, bc)
+
+    # The original block variable of u is the initial guess of the nonlinear solve,
+    # which the solution does not depend on.
+    h = Function(V)
+    h.vector()[:] = rand(V.dim())
+    u.tlm_value = h
+    tape.evaluate_tlm()
+    tlm = u.block_variable.tlm_value
+
+    # Solve the tlm equation with a zero rhs and homogeneous bcs, as done without the shortcut.
+    with stop_annotating():
+        hbc = DirichletBC(V, 0, "on_boundary")
+        expected = Function(V)
+        solve(derivative(F, u, TrialFunction(V)) == Constant(0) * v * dx, expected, hbc)
+
+    assert tlm.vector().norm("l2") == 0
+    assert (tlm.vector().get_local() == expected.vector().get_local()).all()
+
+
 @pytest.mark.parametrize("solve_type",
                          ["solve", "LVS"])
 def test_time_dependent(solve_type):
@@ -0,0 +1,22 @@
+import pytest
+
+from pyadjoint import *
+from pyadjoint.verification import convergence_rates
+
+
+def test_convergence_rates():
+    rates = convergence_rates([1e-2, 2.5e-3, 6.25e-4], [0.01, 0.005, 0.0025], show=False)
+    assert rates == pytest.approx([2.0, 2.0])
+    assert all(type(rate) is float for rate in rates)
+
+
+def test_convergence_rates_zero_residual():
+    with pytest.raises(ZeroDivisionError):
+        convergence_rates([1e-2, 0.0, 6.25e-4], [0.01, 0.005, 0.0025], show=False)
+
+
+def test_taylor_test():
+    a = AdjFloat(2.0)
+    J = a**3
+    Jhat = ReducedFunctional(J, Control(a))
+    assert taylor_test(Jhat, AdjFloat(2.0), AdjFloat(1.0)) > 1.9